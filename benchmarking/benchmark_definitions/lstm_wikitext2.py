@@ -33,12 +33,12 @@ def lstm_wikitext2_benchmark(sagemaker_backend: bool = False, **kwargs):
         # need more memory
         instance_type = DEFAULT_GPU_INSTANCE_4GPU
         n_workers = 4
-    config_space = dict(
-        _config_space,
-        dataset_path="./",
-        epochs=81,
-        report_current_best="False",
-    )
+    config_space = {
+        **_config_space,
+        "dataset_path": "./",
+        "epochs": 81,
+        "report_current_best": "False",
+    }
     _kwargs = dict(
         script=Path(__file__).parent.parent
         / "training_scripts"
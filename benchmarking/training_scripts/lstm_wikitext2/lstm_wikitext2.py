@@ -19,6 +19,7 @@ import logging
 import time
 import math
 from pathlib import Path
+from types import MappingProxyType
 
 try:
     # Benchmark-specific imports are done here, in order to avoid import
@@ -59,13 +60,16 @@ RESOURCE_ATTR = "epoch"
 ELAPSED_TIME_ATTR = "elapsed_time"
 
 
-_config_space = {
-    "lr": loguniform(1, 50),
-    "dropout": uniform(0, 0.99),
-    BATCH_SIZE_KEY: randint(BATCH_SIZE_LOWER, BATCH_SIZE_UPPER),
-    "clip": uniform(0.1, 2),
-    "lr_factor": loguniform(1, 100),
-}
+# Read-only, since it is shared by all benchmark definitions created from it
+_config_space = MappingProxyType(
+    {
+        "lr": loguniform(1, 50),
+        "dropout": uniform(0, 0.99),
+        BATCH_SIZE_KEY: randint(BATCH_SIZE_LOWER, BATCH_SIZE_UPPER),
+        "clip": uniform(0.1, 2),
+        "lr_factor": loguniform(1, 100),
+    }
+)
 
 
 DATASET_PATH = "https://raw.githubusercontent.com/pytorch/examples/master/word_language_model/data/wikitext-2/"
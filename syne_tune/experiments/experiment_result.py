@@ -175,8 +175,7 @@ class ExperimentResult:
         df = self.results
 
         fig, ax = plt.subplots(1, 1, figsize=figsize if figsize else (12, 4))
-        for trial_id in sorted(df.trial_id.unique()):
-            df_trial = df[df.trial_id == trial_id]
+        for _, df_trial in df.groupby("trial_id"):
             df_trial.plot(
                 x=ST_TUNER_TIME,
                 y=metric_name,
@@ -10,8 +10,10 @@
 # on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import itertools
-from typing import Optional, List, Union, Dict, Any
+import multiprocessing
+from typing import Optional, List, Union, Dict, Any, Callable
 
 import numpy as np
 from tqdm import tqdm
@@ -81,6 +83,24 @@ SIMULATED_BACKEND_EXTRA_PARAMETERS = [
         default=False,
         help="If 1, scheduler only suggests configs contained in tabulated benchmark",
     ),
+    dict(
+        name="max_parallel",
+        type=int,
+        default=1,
+        help="Number of experiments run in parallel processes. Default is 1 (sequential)",
+    ),
+    dict(
+        name="num_shards",
+        type=int,
+        default=1,
+        help="Experiments are split into this many shards, only one of which is run here",
+    ),
+    dict(
+        name="shard_index",
+        type=int,
+        default=0,
+        help="Index of shard to run, in 0, ..., num_shards - 1",
+    ),
 ]
 
 
@@ -164,6 +184,20 @@ def get_transfer_learning_evaluations(
     return transfer_learning_evaluations
 
 
+# Experiment runner in worker processes, see
+# :func:`start_experiment_simulated_backend`
+_experiment_runner: Optional[Callable[[str, int, str], None]] = None
+
+
+def _init_experiment_worker(run_experiment: Callable[[str, int, str], None]):
+    global _experiment_runner
+    _experiment_runner = run_experiment
+
+
+def _run_experiment_in_worker(method: str, seed: int, benchmark_name: str):
+    _experiment_runner(method, seed, benchmark_name)
+
+
 def start_experiment_simulated_backend(
     configuration: ConfigDict,
     methods: MethodDefinitions,
@@ -176,7 +210,11 @@ def start_experiment_simulated_backend(
     """
     Runs sequence of experiments with simulator backend sequentially. The loop
     runs over methods selected from ``methods``, repetitions and benchmarks
-    selected from ``benchmark_definitions``
+    selected from ``benchmark_definitions``. If ``configuration.max_parallel > 1``,
+    experiments are run in this many parallel (forked) processes instead.
+    If ``configuration.num_shards > 1``, only every ``num_shards``-th
+    experiment is run, starting from ``configuration.shard_index``. This allows
+    to distribute experiments over several independent launches.
 
     ``map_method_args`` can be used to modify ``method_kwargs`` for constructing
     :class:`~syne_tune.experiments.baselines.MethodArguments`, depending on
@@ -231,16 +269,36 @@ def start_experiment_simulated_backend(
         benchmark_definitions = benchmark_definitions[configuration.benchmark_key]
     set_logging_level(configuration)
 
-    combinations = list(
-        itertools.product(method_names, configuration.seeds, benchmark_names)
+    num_shards = configuration.num_shards
+    shard_index = configuration.shard_index
+    assert (
+        0 <= shard_index < num_shards
+    ), f"shard_index = {shard_index} must be in [0, {num_shards - 1}]"
+    num_combinations = len(
+        range(
+            shard_index,
+            len(method_names) * len(configuration.seeds) * len(benchmark_names),
+            num_shards,
+        )
+    )
+    combinations = itertools.islice(
+        itertools.product(method_names, configuration.seeds, benchmark_names),
+        shard_index,
+        None,
+        num_shards,
+    )
+    print(
+        f"Running {num_combinations} experiments (shard {shard_index} of "
+        f"{num_shards}): methods = {method_names}, seeds = "
+        f"{configuration.seeds}, benchmarks = {benchmark_names}"
     )
-    print(combinations)
     do_scale = (
         configuration.scale_max_wallclock_time
         and configuration.n_workers is not None
         and configuration.max_wallclock_time is None
     )
-    for method, seed, benchmark_name in tqdm(combinations):
+
+    def run_experiment(method: str, seed: int, benchmark_name: str):
         random_seed = effective_random_seed(master_random_seed, seed)
         np.random.seed(random_seed)
         benchmark = benchmark_definitions[benchmark_name]
@@ -359,6 +417,32 @@ def start_experiment_simulated_backend(
         )
         tuner.run()
 
+    max_parallel = min(configuration.max_parallel, num_combinations)
+    if max_parallel > 1:
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError(
+                f"max_parallel = {configuration.max_parallel} requires worker "
+                "processes to be forked, which is not supported on this "
+                "platform. Use --max_parallel 1"
+            )
+        # Worker processes are forked, so they inherit ``run_experiment``, which
+        # cannot be pickled
+        with ProcessPoolExecutor(
+            max_workers=max_parallel,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_experiment_worker,
+            initargs=(run_experiment,),
+        ) as executor:
+            futures = [
+                executor.submit(_run_experiment_in_worker, *combination)
+                for combination in combinations
+            ]
+            for future in tqdm(as_completed(futures), total=num_combinations):
+                future.result()
+    else:
+        for method, seed, benchmark_name in tqdm(combinations, total=num_combinations):
+            run_experiment(method, seed, benchmark_name)
+
 
 def main(
     methods: MethodDefinitions,
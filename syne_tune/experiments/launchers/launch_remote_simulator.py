@@ -82,6 +82,7 @@ def get_hyperparameters(
         "max_wallclock_time",
         "max_size_data_for_model",
         "fcnet_ordinal",
+        "max_parallel",
     ):
         v = getattr(configuration, k)
         if v is not None:
@@ -169,6 +170,9 @@ def launch_remote_experiments_simulator(
     iterates over its inner level of benchmarks. This is useful if the number
     of benchmarks to iterate over is large.
 
+    If ``configuration.num_shards > 1``, only every ``num_shards``-th remote
+    job is launched, starting from ``configuration.shard_index``.
+
     :param configuration: ConfigDict with parameters of the benchmark.
             Must contain all parameters from
             hpo_main_simulator.LOCAL_LOCAL_SIMULATED_BENCHMARK_REQUIRED_PARAMETERS
@@ -212,6 +216,14 @@ def launch_remote_experiments_simulator(
         combinations = list(itertools.product(combinations, benchmark_keys))
     else:
         combinations = [(x, None) for x in combinations]
+    # Sharding applies to the launched jobs. It is not forwarded to them,
+    # since each job runs all experiments it is launched for
+    num_shards = configuration.num_shards
+    shard_index = configuration.shard_index
+    assert (
+        0 <= shard_index < num_shards
+    ), f"shard_index = {shard_index} must be in [0, {num_shards - 1}]"
+    combinations = combinations[shard_index::num_shards]
 
     for (method, seed), benchmark_key in tqdm(combinations):
         tuner_name = method
@@ -15,7 +15,6 @@ import logging
 import copy
 from dataclasses import dataclass
 
-import numpy as np
 import pandas as pd
 
 from syne_tune.constants import (
@@ -245,10 +244,10 @@ class TrialsOfExperimentResults:
             col = subplot_no // nrows
             ax = axs[row, col]
             current_color = [0] * (num_rungs + 1)
-            for trial_id in setup_df.trial_id.unique():
-                sub_df = setup_df[setup_df["trial_id"] == trial_id]
-                y = np.array(sub_df[plot_params.metric])
-                rt = np.array(sub_df[ST_TUNER_TIME])
+            # ``sort=False`` keeps trials in order of first appearance
+            for _, sub_df in setup_df.groupby("trial_id", sort=False):
+                y = sub_df[plot_params.metric].to_numpy()
+                rt = sub_df[ST_TUNER_TIME].to_numpy()
                 sz = y.size
                 if is_multi_fidelity:
                     rungs_here = [x for x in self._rung_levels if x < sz]
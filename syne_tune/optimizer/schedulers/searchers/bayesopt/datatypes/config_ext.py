@@ -84,9 +84,8 @@ class ExtendedConfiguration:
         :return: ``config_ext`` without resource attribute
         """
         if self.resource_attr_name in config_ext:
-            config = {
-                k: v for k, v in config_ext.items() if k != self.resource_attr_name
-            }
+            config = dict(config_ext)
+            del config[self.resource_attr_name]
         else:
             config = config_ext
         return config
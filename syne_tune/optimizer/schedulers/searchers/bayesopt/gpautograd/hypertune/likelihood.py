@@ -95,6 +95,7 @@ class HyperTuneIndependentGPMarginalLikelihood(
             noise_variance=self._noise_variance(),
             resource_attr_range=self.resource_attr_range,
             ensemble_distribution=self._ensemble_distribution,
+            state_cache=self._state_cache,
         )
 
 
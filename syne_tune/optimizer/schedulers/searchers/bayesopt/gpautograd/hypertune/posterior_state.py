@@ -17,6 +17,7 @@ from numpy.random import RandomState
 from syne_tune.optimizer.schedulers.searchers.bayesopt.gpautograd.independent.posterior_state import (
     IndependentGPPerResourcePosteriorState,
     NoiseVariance,
+    PerResourceStateCache,
 )
 from syne_tune.optimizer.schedulers.searchers.bayesopt.gpautograd.hypertune.utils import (
     ExtendFeaturesByResourceMixin,
@@ -116,6 +117,7 @@ class HyperTuneIndependentGPPosteriorState(IndependentGPPerResourcePosteriorStat
         resource_attr_range: Tuple[int, int],
         ensemble_distribution: Dict[int, float],
         debug_log: bool = False,
+        state_cache: Optional[PerResourceStateCache] = None,
     ):
         """
         ``ensemble_distribution`` contains non-zero entries of the distribution
@@ -131,6 +133,7 @@ class HyperTuneIndependentGPPosteriorState(IndependentGPPerResourcePosteriorStat
             noise_variance=noise_variance,
             resource_attr_range=resource_attr_range,
             debug_log=debug_log,
+            state_cache=state_cache,
         )
         assert_ensemble_distribution(ensemble_distribution, set(mean.keys()))
         self.ensemble_distribution = ensemble_distribution
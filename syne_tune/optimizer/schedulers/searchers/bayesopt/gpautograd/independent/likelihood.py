@@ -20,6 +20,7 @@ from syne_tune.optimizer.schedulers.searchers.bayesopt.gpautograd.likelihood imp
 )
 from syne_tune.optimizer.schedulers.searchers.bayesopt.gpautograd.independent.posterior_state import (
     IndependentGPPerResourcePosteriorState,
+    PerResourceStateCache,
 )
 from syne_tune.optimizer.schedulers.searchers.bayesopt.gpautograd.constants import (
     INITIAL_NOISE_VARIANCE,
@@ -126,6 +127,7 @@ class IndependentGPPerResourceMarginalLikelihood(MarginalLikelihood):
         self.target_transform = target_transform
         self.resource_attr_range = resource_attr_range
         self._separate_noise_variances = separate_noise_variances
+        self._state_cache = PerResourceStateCache()
         with self.name_scope():
             self.covariance_scale_internal = {
                 resource: register_parameter(
@@ -173,6 +175,7 @@ class IndependentGPPerResourceMarginalLikelihood(MarginalLikelihood):
             covariance_scale=self._covariance_scale(),
             noise_variance=self._noise_variance(),
             resource_attr_range=self.resource_attr_range,
+            state_cache=self._state_cache,
         )
 
     def forward(self, data: Dict[str, Any]):
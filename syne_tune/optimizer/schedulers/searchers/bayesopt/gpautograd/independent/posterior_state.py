@@ -10,9 +10,11 @@
 # on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
-from typing import Dict, Tuple, Optional, Callable, Union
+from collections import OrderedDict
+from typing import Dict, Tuple, Optional, Callable, Union, List
 import numpy as np
 import autograd.numpy as anp
+from autograd.tracer import isbox
 from numpy.random import RandomState
 
 from syne_tune.optimizer.schedulers.searchers.bayesopt.gpautograd.posterior_state import (
@@ -21,6 +23,7 @@ from syne_tune.optimizer.schedulers.searchers.bayesopt.gpautograd.posterior_stat
 )
 from syne_tune.optimizer.schedulers.searchers.utils.hp_ranges_impl import (
     decode_extended_features,
+    decode_extended_resource,
 )
 from syne_tune.optimizer.schedulers.searchers.bayesopt.gpautograd.kernel import (
     KernelFunction,
@@ -32,6 +35,65 @@ from syne_tune.optimizer.schedulers.searchers.bayesopt.gpautograd.mean import (
 
 NoiseVariance = Union[np.ndarray, Dict[int, np.ndarray]]
 
+# If ``predict`` is called with at most this many distinct resources, rows are
+# grouped by Boolean masks, otherwise by sorting
+PREDICT_MASK_MAX_RESOURCES = 4
+
+
+class PerResourceStateCache:
+    """
+    Cache for the per-resource posterior states of
+    :class:`IndependentGPPerResourcePosteriorState`, with least recently used
+    eviction. Keys depend on the data for a resource and on the values of all
+    parameters. This allows to reuse the Cholesky factorizations for resources
+    whose targets have not changed.
+
+    Targets are normalized by mean and standard deviation over all observed
+    data by default, so a new observation changes the targets at every
+    resource, and nothing is reused. Hits happen when observed data and
+    parameters are unchanged, while pending evaluations differ: the posterior
+    state for observed data only is fully reused, and in the posterior state
+    with fantasies, resources without pending evaluations are reused.
+
+    :param maxsize: Maximum number of entries
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def get(self, key: Tuple) -> Optional[GaussProcPosteriorState]:
+        state = self._entries.get(key)
+        if state is not None:
+            self._entries.move_to_end(key)
+        return state
+
+    def put(self, key: Tuple, state: GaussProcPosteriorState):
+        self._entries[key] = state
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+def _array_key(x) -> Tuple:
+    x = np.asarray(x)
+    return x.shape, x.tobytes()
+
+
+def _parameter_values(block) -> List[Tuple[str, np.ndarray]]:
+    # Parameter names contain prefixes specific to the block instance, so
+    # that keys identify the block as well
+    return [
+        (name, param.data()) for name, param in sorted(block.collect_params().items())
+    ]
+
+
+def _parameters_key(values: List[Tuple[str, np.ndarray]]) -> Tuple:
+    return tuple((name, _array_key(value)) for name, value in values)
+
 
 class IndependentGPPerResourcePosteriorState(PosteriorStateWithSampleJoint):
     """
@@ -56,6 +118,7 @@ class IndependentGPPerResourcePosteriorState(PosteriorStateWithSampleJoint):
         noise_variance: NoiseVariance,
         resource_attr_range: Tuple[int, int],
         debug_log: bool = False,
+        state_cache: Optional[PerResourceStateCache] = None,
     ):
         """
         ``mean`` and ``covariance_scale`` map supported resource levels r to
@@ -68,6 +131,9 @@ class IndependentGPPerResourcePosteriorState(PosteriorStateWithSampleJoint):
         :param covariance_scale: See above
         :param noise_variance: See above
         :param resource_attr_range: (r_min, r_max)
+        :param state_cache: If given, per-resource states are looked up here
+            before being computed. Not used if arguments are ``autograd``
+            boxes (i.e., when the likelihood is differentiated)
         """
         assert isinstance(kernel, KernelFunction), "kernel must be KernelFunction"
         self.rung_levels = sorted(mean.keys())
@@ -92,12 +158,16 @@ class IndependentGPPerResourcePosteriorState(PosteriorStateWithSampleJoint):
             noise_variance,
             resource_attr_range,
             debug_log,
+            state_cache,
         )
         self._mean = mean  # See ``sample_joint``
         self._num_data = features.shape[0]
         self._num_features = features.shape[1]
         self._num_fantasies = targets.shape[1]
         self._resource_attr_range = resource_attr_range
+        # Caches for ``_decode_features`` and ``_split_features``
+        self._cached_decode = (None, None)
+        self._cached_split = (None, None)
 
     def _compute_states(
         self,
@@ -109,23 +179,65 @@ class IndependentGPPerResourcePosteriorState(PosteriorStateWithSampleJoint):
         noise_variance: Dict[int, np.ndarray],
         resource_attr_range: Tuple[int, int],
         debug_log: bool = False,
+        state_cache: Optional[PerResourceStateCache] = None,
     ):
-        features, resources = decode_extended_features(features, resource_attr_range)
+        features, resources = self._decode_features_internal(
+            features, resource_attr_range
+        )
+        # Group rows by resource with a single sort, so that the data for each
+        # resource is a contiguous slice
+        order = np.argsort(resources, kind="stable")
+        sorted_resources = resources[order]
+        features = features[order]
+        targets = targets[order]
+        rung_levels = np.array(self.rung_levels)
+        starts = np.searchsorted(sorted_resources, rung_levels, side="left")
+        ends = np.searchsorted(sorted_resources, rung_levels, side="right")
+        if state_cache is not None:
+            kernel_values = _parameter_values(kernel)
+            mean_values = {
+                resource: _parameter_values(mean[resource])
+                for resource in self.rung_levels
+            }
+            if (
+                isbox(targets)
+                or any(isbox(x) for x in covariance_scale.values())
+                or any(isbox(x) for x in noise_variance.values())
+                or any(isbox(x) for _, x in kernel_values)
+                or any(isbox(x) for values in mean_values.values() for _, x in values)
+            ):
+                state_cache = None
+            else:
+                kernel_key = _parameters_key(kernel_values)
         self._states = dict()
-        for resource, mean_function in mean.items():
-            cov_scale = covariance_scale[resource]
-            rows = np.flatnonzero(resources == resource)
-            if rows.size > 0:
-                r_features = features[rows]
-                r_targets = targets[rows]
-                self._states[resource] = GaussProcPosteriorState(
-                    features=r_features,
-                    targets=r_targets,
-                    mean=mean_function,
-                    kernel=(kernel, cov_scale),
-                    noise_variance=noise_variance[resource],
-                    debug_log=debug_log,
-                )
+        for resource, start, end in zip(self.rung_levels, starts, ends):
+            if end > start:
+                r_features = features[start:end]
+                r_targets = targets[start:end]
+                state = None
+                if state_cache is not None:
+                    key = (
+                        resource,
+                        _array_key(r_features),
+                        _array_key(r_targets),
+                        _array_key(covariance_scale[resource]),
+                        _array_key(noise_variance[resource]),
+                        kernel_key,
+                        _parameters_key(mean_values[resource]),
+                    )
+                    state = state_cache.get(key)
+                if state is None:
+                    state = GaussProcPosteriorState(
+                        features=r_features,
+                        targets=r_targets,
+                        mean=mean[resource],
+                        kernel=(kernel, covariance_scale[resource]),
+                        noise_variance=noise_variance[resource],
+                        debug_log=debug_log,
+                    )
+                    if state_cache is not None:
+                        state_cache.put(key, state)
+                self._states[resource] = state
 
     def state(self, resource: int) -> GaussProcPosteriorState:
         return self._states[resource]
@@ -143,50 +255,111 @@ class IndependentGPPerResourcePosteriorState(PosteriorStateWithSampleJoint):
         return self._num_fantasies
 
     def neg_log_likelihood(self) -> anp.ndarray:
-        return anp.sum([state.neg_log_likelihood() for state in self._states.values()])
+        # Accumulate in a loop, which avoids boxing a list into an array in
+        # the ``autograd`` graph
+        total = 0.0
+        for state in self._states.values():
+            total = total + state.neg_log_likelihood()
+        return total
+
+    def _decode_features(self, features: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Same as :func:`decode_extended_features`, but the result for the most
+        recent input is cached. The cache is keyed on the identity of
+        ``features``, so the array must not be modified in place between calls.
+        This happens to be the case during acquisition function optimization,
+        where the same matrix of test features is passed several times.
+        """
+        cached_features, cached_result = self._cached_decode
+        if features is cached_features:
+            return cached_result
+        result = self._decode_features_internal(features, self._resource_attr_range)
+        if isinstance(features, np.ndarray):
+            self._cached_decode = (features, result)
+        return result
+
+    @staticmethod
+    def _decode_features_internal(
+        features: np.ndarray, resource_attr_range: Tuple[int, int]
+    ) -> (np.ndarray, np.ndarray):
+        # Resource values are small integers. A narrow dtype makes the
+        # comparisons and sorts on them cheaper
+        return decode_extended_features(
+            features, resource_attr_range, resource_dtype="int32"
+        )
 
     # Different to ``sample_marginals``, ``sample_joint``, this method supports
     # ``autograd`` differentiation
     def predict(self, test_features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        test_features, resources = decode_extended_features(
-            test_features, self._resource_attr_range
-        )
-        if len(set(resources)) == 1:
-            return self._states[resources[0]].predict(test_features)
+        features, resources = self._decode_features(test_features)
+        resource_set = set(resources.tolist())
+        if len(resource_set) == 1:
+            return self._states[int(resources[0])].predict(features)
         else:
             num_rows = resources.size
-            # Group resources together by sorting them
-            ind = np.argsort(resources)
-            test_features = test_features[ind]
-            resources = resources[ind]
-            # Find positions where resource value changes
-            change_pos = (
-                [0]
-                + list(np.flatnonzero(resources[:-1] != resources[1:]) + 1)
-                + [num_rows]
-            )
+            if len(resource_set) <= PREDICT_MASK_MAX_RESOURCES:
+                # Few distinct resources: Selecting rows by mask is cheaper
+                # than sorting
+                groups = [
+                    (resource, np.flatnonzero(resources == resource))
+                    for resource in sorted(resource_set)
+                ]
+                blocks = [(resource, features[rows]) for resource, rows in groups]
+            else:
+                features_per_resource = self._split_features(test_features)
+                groups = [
+                    (resource, rows)
+                    for resource, (_, rows) in features_per_resource.items()
+                ]
+                blocks = [
+                    (resource, block_features)
+                    for resource, (block_features, _) in features_per_resource.items()
+                ]
             p_means, p_vars = zip(
                 *[
-                    self._states[resources[start]].predict(test_features[start:end])
-                    for start, end in zip(change_pos[:-1], change_pos[1:])
+                    self._states[resource].predict(features)
+                    for resource, features in blocks
                 ]
             )
-            reverse_ind = np.empty_like(ind)
-            reverse_ind[ind] = np.arange(num_rows)
-            posterior_means = anp.concatenate(p_means, axis=0)[reverse_ind]
-            posterior_variances = anp.concatenate(p_vars, axis=0)[reverse_ind]
+            if any(isbox(x) for x in p_means + p_vars):
+                # ``autograd`` does not support assignments to arrays
+                ind = np.concatenate([rows for _, rows in groups])
+                reverse_ind = np.empty_like(ind)
+                reverse_ind[ind] = np.arange(num_rows)
+                posterior_means = anp.concatenate(p_means, axis=0)[reverse_ind]
+                posterior_variances = anp.concatenate(p_vars, axis=0)[reverse_ind]
+            else:
+                # Write blocks directly to their rows in preallocated outputs
+                posterior_means = np.empty((num_rows,) + p_means[0].shape[1:])
+                posterior_variances = np.empty((num_rows,) + p_vars[0].shape[1:])
+                for (_, rows), p_mean, p_var in zip(groups, p_means, p_vars):
+                    posterior_means[rows] = p_mean
+                    posterior_variances[rows] = p_var
             return posterior_means, posterior_variances
 
     def _split_features(self, features: np.ndarray):
-        features, resources = decode_extended_features(
-            features, self._resource_attr_range
-        )
-        result = dict()
-        for resource in set(resources):
-            rows = np.flatnonzero(resources == resource)
-            result[resource] = (features[rows], rows)
+        cached_features, cached_result = self._cached_split
+        if features is cached_features:
+            return cached_result
+        result = self._split_features_internal(features)
+        if isinstance(features, np.ndarray):
+            self._cached_split = (features, result)
         return result
 
+    def _split_features_internal(self, features_ext: np.ndarray):
+        features, resources = self._decode_features(features_ext)
+        unique_resources, inverse = np.unique(resources, return_inverse=True)
+        # Rows grouped by resource, and boundaries of the groups
+        order = np.argsort(inverse, kind="stable")
+        edges = np.concatenate(([0], np.cumsum(np.bincount(inverse))))
+        features = features[order]
+        return {
+            resource: (features[start:end], order[start:end])
+            for resource, start, end in zip(
+                unique_resources.tolist(), edges[:-1], edges[1:]
+            )
+        }
+
     def _sample_internal(
         self,
         test_features: np.ndarray,
@@ -197,7 +370,9 @@ class IndependentGPPerResourcePosteriorState(PosteriorStateWithSampleJoint):
         num_test = test_features.shape[0]
         nf = self.num_fantasies
         shp = (num_test, num_samples) if nf == 1 else (num_test, nf, num_samples)
-        samples = np.zeros(shp)
+        # Rows of ``features_per_resource`` partition all test points, so every
+        # entry of ``samples`` is written below
+        samples = np.empty(shp)
         bc_shp = (1,) * (len(shp) - 1)
         for resource, (features, rows) in features_per_resource.items():
             if resource in self._states:
@@ -208,6 +383,9 @@ class IndependentGPPerResourcePosteriorState(PosteriorStateWithSampleJoint):
                     + str(list(self._mean.keys()))
                     + ")"
                 )
+                # Prior mean, shape (k, 1, ...). This is broadcast by the
+                # assignment below, without creating a temporary of the size
+                # of ``samples[rows]``
                 vec = self._mean[resource](features)
                 sample_part = np.reshape(vec, (vec.size,) + bc_shp)
             samples[rows] = sample_part
@@ -270,14 +448,16 @@ class IndependentGPPerResourcePosteriorState(PosteriorStateWithSampleJoint):
         mean_data: float,
         std_data: float,
     ) -> np.ndarray:
-        inner_input, resource = decode_extended_features(
-            input.reshape((1, -1)), self._resource_attr_range
-        )
-        assert resource.size == 1
-        resource = resource.item()
-        inner_grad = (
-            self._states[resource]
-            .backward_gradient(inner_input, head_gradients, mean_data, std_data)
-            .reshape((-1,))
+        # ``input`` is a single extended config, so we can avoid the overhead
+        # of ``decode_extended_features``
+        assert (
+            input.ndim == 1 or input.shape[0] == 1
+        ), f"input must be a single extended config, but has shape {input.shape}"
+        input_vec = input.reshape((-1,))
+        resource = decode_extended_resource(input_vec[-1], self._resource_attr_range)
+        inner_grad = self._states[resource].backward_gradient(
+            input_vec[:-1].reshape((1, -1)), head_gradients, mean_data, std_data
         )
-        return np.reshape(np.concatenate((inner_grad, np.zeros((1,)))), input.shape)
+        gradient = np.zeros(input_vec.size)
+        gradient[:-1] = inner_grad.reshape((-1,))
+        return gradient.reshape(input.shape)
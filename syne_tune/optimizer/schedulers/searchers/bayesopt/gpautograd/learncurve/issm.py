@@ -45,7 +45,7 @@ from syne_tune.optimizer.schedulers.searchers.bayesopt.datatypes.config_ext impo
 
 def _prepare_data_internal(
     state: TuningJobState,
-    data_lst: List[Tuple[Configuration, List, str]],
+    data_lst: List[Tuple[Configuration, np.ndarray, str]],
     config_space_ext: ExtendedConfiguration,
     active_metric: str,
     do_fantasizing: bool,
@@ -79,19 +79,9 @@ def _prepare_data_internal(
 
     trial_ids_done = set()
     for config, observed, trial_id in data_lst:
-        # Observations must be from r_min without any missing
-        obs_res = [x[0] for x in observed]
-        num_obs = len(observed)
-        if num_obs > 0:
-            test = list(range(r_min, r_min + num_obs))
-            assert obs_res == test, (
-                f"trial_id {trial_id} has observations at {obs_res}, but "
-                + f"we need them at {test}"
-            )
+        num_obs = observed.size
         # Note: Only observed targets are normalized, not fantasized ones
-        this_targets = (
-            np.array([x[1] for x in observed]).reshape((-1, 1)) - mean
-        ) / std
+        this_targets = (observed.reshape((-1, 1)) - mean) / std
         if do_fantasizing:
             if num_fantasy_samples > 1:
                 this_targets = this_targets * np.ones((1, num_fantasy_samples))
@@ -131,15 +121,35 @@ def _prepare_data_internal(
     return configs, targets, trial_ids
 
 
-def _create_tuple(ev: TrialEvaluations, active_metric: str, config_for_trial: Dict):
+def _create_tuple(
+    ev: TrialEvaluations, active_metric: str, config_for_trial: Dict, r_min: int
+) -> Tuple[Configuration, np.ndarray, str]:
+    """
+    Observed targets of a trial are returned as array, ordered by resource
+    level. They must be from ``r_min`` without any missing.
+    """
     metric_vals = ev.metrics[active_metric]
     assert isinstance(metric_vals, dict)
-    observed = list(
-        sorted(((int(k), v) for k, v in metric_vals.items()), key=itemgetter(0))
-    )
     trial_id = ev.trial_id
+    num_obs = len(metric_vals)
+    resources = np.fromiter(
+        (int(k) for k in metric_vals.keys()), dtype=np.int64, count=num_obs
+    )
+    observed = np.fromiter(metric_vals.values(), dtype=np.float64, count=num_obs)
+    order = np.argsort(resources)
+    resources = resources[order]
+    test = np.arange(r_min, r_min + num_obs)
+    assert np.array_equal(resources, test), (
+        f"trial_id {trial_id} has observations at {resources.tolist()}, but "
+        + f"we need them at {test.tolist()}"
+    )
     config = config_for_trial[trial_id]
-    return config, observed, trial_id
+    return config, observed[order], trial_id
+
+
+def _mean_and_std_of_targets(targets: List[np.ndarray]) -> (float, float):
+    targets = np.concatenate(targets) if targets else np.zeros(0)
+    return np.mean(targets), max(np.std(targets), 1e-9)
 
 
 def prepare_data(
@@ -177,18 +187,14 @@ def prepare_data(
     """
     r_min, r_max = config_space_ext.resource_attr_range
     hp_ranges = config_space_ext.hp_ranges
-    data_lst = []
-    targets = []
-    for ev in state.trials_evaluations:
-        tpl = _create_tuple(ev, active_metric, state.config_for_trial)
-        data_lst.append(tpl)
-        observed = tpl[1]
-        targets += [x[1] for x in observed]
+    data_lst = [
+        _create_tuple(ev, active_metric, state.config_for_trial, r_min)
+        for ev in state.trials_evaluations
+    ]
     mean = 0.0
     std = 1.0
     if normalize_targets:
-        std = max(np.std(targets), 1e-9)
-        mean = np.mean(targets)
+        mean, std = _mean_and_std_of_targets([x[1] for x in data_lst])
 
     configs, targets, trial_ids = _prepare_data_internal(
         state=state,
@@ -251,7 +257,7 @@ def prepare_data_with_pending(
     targets = []
     done_trial_ids = set()
     for ev in state.trials_evaluations:
-        tpl = _create_tuple(ev, active_metric, state.config_for_trial)
+        tpl = _create_tuple(ev, active_metric, state.config_for_trial, r_min)
         _, observed, trial_id = tpl
         if trial_id not in num_pending_for_trial:
             data1_lst.append(tpl)
@@ -259,18 +265,17 @@ def prepare_data_with_pending(
             data2_lst.append(tpl)
             num_pending.append(num_pending_for_trial[trial_id])
         done_trial_ids.add(trial_id)
-        targets += [x[1] for x in observed]
+        targets.append(observed)
     mean = 0.0
     std = 1.0
     if normalize_targets:
-        std = max(np.std(targets), 1e-9)
-        mean = np.mean(targets)
+        mean, std = _mean_and_std_of_targets(targets)
     # There may be trials with pending evaluations, but no observed ones
     for ev in state.pending_evaluations:
         trial_id = ev.trial_id
         if trial_id not in done_trial_ids:
             config = state.config_for_trial[trial_id]
-            data2_lst.append((config, [], trial_id))
+            data2_lst.append((config, np.zeros(0), trial_id))
             num_pending.append(num_pending_for_trial[trial_id])
 
     results = ()
@@ -10,7 +10,8 @@
 # on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
-from typing import Dict, Optional, Callable, Union
+from collections import Counter
+from typing import Dict, Optional, Callable, Union, Iterable
 import logging
 import copy
 
@@ -100,6 +101,12 @@ class ModelStateTransformer:
     fitting only depends on ``state.trials_evaluations`` (observed data),
     not on other fields (e.g., pending evaluations).
 
+    The predictor returned by :meth:`fit` (which wraps the posterior state) is
+    cached, so that the posterior state is computed only once for all
+    acquisition function evaluations in a ``get_config`` call. The cache is
+    invalidated by all methods which modify the state. In the multi-fidelity
+    case, :meth:`observations_per_resource` is maintained incrementally.
+
     If given, ``state_converter`` maps the state to another one which is then
     passed to the model for fitting and predictions. One important use case is
     filtering down data when model fitting is superlinear. Another is to convert
@@ -168,6 +175,9 @@ class ModelStateTransformer:
         self._state = copy.copy(init_state)
         # OutputPredictor computed on demand
         self._predictor: Optional[OutputPredictor] = None
+        # Number of observations per resource level, for metrics requested in
+        # :meth:`observations_per_resource`
+        self._observations_per_resource: Dict[str, Counter] = dict()
         # Observed data for which model parameters were re-fit most
         # recently, separately for each model
         self._num_evaluations = {output_name: 0 for output_name in estimator.keys()}
@@ -176,6 +186,42 @@ class ModelStateTransformer:
     def state(self) -> TuningJobState:
         return self._state
 
+    def observations_per_resource(
+        self, metric_name: str = INTERNAL_METRIC_NAME
+    ) -> Counter:
+        """
+        Only for the multi-fidelity case, where observations for ``metric_name``
+        are dictionaries with resource levels as keys. The histogram is computed
+        from the state the first time it is requested for ``metric_name``, and
+        updated incrementally afterwards. It must not be modified.
+
+        :param metric_name: Name of internal metric
+        :return: Number of observations per resource level (int), only for
+            levels with at least one observation
+        """
+        histogram = self._observations_per_resource.get(metric_name)
+        if histogram is None:
+            histogram = Counter(
+                int(resource)
+                for trial_eval in self._state.trials_evaluations
+                for resource in trial_eval.metrics.get(metric_name, dict()).keys()
+            )
+            self._observations_per_resource[metric_name] = histogram
+        return histogram
+
+    def _update_observations_per_resource(
+        self, metric_name: str, resources: Iterable[str], increment: int
+    ):
+        histogram = self._observations_per_resource.get(metric_name)
+        if histogram is not None:
+            for resource in resources:
+                resource = int(resource)
+                count = histogram[resource] + increment
+                if count > 0:
+                    histogram[resource] = count
+                else:
+                    del histogram[resource]
+
     def _unwrap_from_dict(self, x):
         if self._use_single_model:
             return next(iter(x.values()))
@@ -253,7 +299,10 @@ class ModelStateTransformer:
             at which resource level the evaluation is pending
 
         """
-        return self._state.remove_pending(trial_id, resource)
+        removed = self._state.remove_pending(trial_id, resource)
+        if removed:
+            self._predictor = None  # Invalidate
+        return removed
 
     def remove_observed_case(
         self,
@@ -276,6 +325,10 @@ class ModelStateTransformer:
             + f"does not contain metric {metric_name}"
         )
         if key is None:
+            if isinstance(metrics[metric_name], dict):
+                self._update_observations_per_resource(
+                    metric_name, metrics[metric_name].keys(), increment=-1
+                )
             del metrics[metric_name]
         else:
             metric_vals = metrics[metric_name]
@@ -285,6 +338,8 @@ class ModelStateTransformer:
                 + f"key {key}"
             )
             del metric_vals[key]
+            self._update_observations_per_resource(metric_name, [key], increment=-1)
+        self._predictor = None  # Invalidate
 
     def label_trial(
         self, data: TrialEvaluations, config: Optional[Configuration] = None
@@ -315,6 +370,13 @@ class ModelStateTransformer:
         # Assign / append new labels
         metrics = self._state.metrics_for_trial(trial_id, config=config)
         for name, new_labels in data.metrics.items():
+            if isinstance(new_labels, dict):
+                old_labels = metrics.get(name, dict())
+                self._update_observations_per_resource(
+                    name,
+                    [key for key in new_labels.keys() if key not in old_labels],
+                    increment=1,
+                )
             if name not in metrics or not isinstance(new_labels, dict):
                 metrics[name] = new_labels
             else:
@@ -31,6 +31,9 @@ from syne_tune.optimizer.schedulers.searchers.bayesopt.datatypes.common import (
     PendingEvaluation,
     MetricValues,
 )
+from syne_tune.optimizer.schedulers.searchers.bayesopt.datatypes.tuning_job_state import (
+    TuningJobState,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -146,6 +149,8 @@ class GPMultiFidelitySearcher(GPFIFOSearcher):
             config_space, metric, points_to_evaluate=points_to_evaluate, **kwargs
         )
         self._resource_attr = None
+        # Maps rung levels to keys used in :class:`MetricValues`
+        self._rung_key_table = dict()
 
     def _create_kwargs_int(self, kwargs):
         _kwargs = check_and_merge_defaults(
@@ -179,19 +184,21 @@ class GPMultiFidelitySearcher(GPFIFOSearcher):
             scheduler, MultiFidelitySchedulerMixin
         ), "This searcher requires MultiFidelitySchedulerMixin scheduler"
         self._resource_attr = scheduler.resource_attr
+        self._rung_key_table = {
+            resource: str(resource) for resource in scheduler.rung_levels
+        }
 
     def _hp_ranges_in_state(self):
         return self.config_space_ext.hp_ranges_ext
 
-    def _config_ext_update(self, config, result):
-        resource = int(result[self._resource_attr])
-        return self.config_space_ext.get(config, resource)
-
     def _metric_val_update(
         self, crit_val: float, result: Dict[str, Any]
     ) -> MetricValues:
         resource = result[self._resource_attr]
-        return {str(resource): crit_val}
+        key = self._rung_key_table.get(resource)
+        if key is None:
+            key = str(resource)
+        return {key: crit_val}
 
     def _trial_id_string(self, trial_id: str, result: Dict[str, Any]):
         """
@@ -236,7 +243,7 @@ class GPMultiFidelitySearcher(GPFIFOSearcher):
             # BO should only search over configs at resource level
             # target_resource
             if state.trials_evaluations:
-                target_resource = self.resource_for_acquisition(state, **kwargs)
+                target_resource = self._target_resource(state, **kwargs)
             else:
                 # Any valid value works here:
                 target_resource = self.config_space_ext.resource_attr_range[0]
@@ -246,6 +253,13 @@ class GPMultiFidelitySearcher(GPFIFOSearcher):
                     f"Score values computed at target_resource = {target_resource}"
                 )
 
+    def _target_resource(self, state: TuningJobState, **kwargs) -> int:
+        # Histograms of observations per resource are maintained incrementally,
+        # which avoids a pass over all observed data in every ``get_config``
+        return self.resource_for_acquisition.from_observations_per_resource(
+            state, self.state_transformer.observations_per_resource, **kwargs
+        )
+
     def _postprocess_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         # If ``config`` is normal (not extended), nothing is removed
         return self.config_space_ext.remove_resource(config)
@@ -257,8 +271,9 @@ class GPMultiFidelitySearcher(GPFIFOSearcher):
         self.state_transformer.mark_trial_failed(trial_id)
 
     def cleanup_pending(self, trial_id: str):
+        # Pending evaluations for which ``filter_pred`` is ``False`` are removed
         def filter_pred(x: PendingEvaluation) -> bool:
-            return x.trial_id == trial_id
+            return x.trial_id != trial_id
 
         self.state_transformer.filter_pending_evaluations(filter_pred)
 
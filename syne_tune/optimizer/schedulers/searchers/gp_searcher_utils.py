@@ -166,6 +166,24 @@ class ResourceForAcquisitionMap:
     def __call__(self, state: TuningJobState, **kwargs) -> int:
         raise NotImplementedError()
 
+    def from_observations_per_resource(
+        self,
+        state: TuningJobState,
+        observations_per_resource: Callable[[str], Counter],
+        **kwargs,
+    ) -> int:
+        """
+        Same as :meth:`__call__`, but subclasses may use histograms of the
+        number of observations per resource level instead of iterating over
+        ``state.trials_evaluations``.
+
+        :param state: Current state
+        :param observations_per_resource: Maps metric name to histogram, see
+            :meth:`~syne_tune.optimizer.schedulers.searchers.bayesopt.models.model_transformer.ModelStateTransformer.observations_per_resource`
+        :return: Resource level ``r_acq``
+        """
+        return self(state, **kwargs)
+
 
 class ResourceForAcquisitionBOHB(ResourceForAcquisitionMap):
     """
@@ -180,15 +198,28 @@ class ResourceForAcquisitionBOHB(ResourceForAcquisitionMap):
         self.active_metric = active_metric
 
     def __call__(self, state: TuningJobState, **kwargs) -> int:
-        assert (
-            state.num_observed_cases(self.active_metric) > 0
-        ), f"state must have data for metric {self.active_metric}"
-        all_resources = []
-        for cand_eval in state.trials_evaluations:
-            all_resources += [
-                int(r) for r in cand_eval.metrics[self.active_metric].keys()
-            ]
-        histogram = Counter(all_resources)
+        histogram = Counter(
+            int(r)
+            for cand_eval in state.trials_evaluations
+            for r in cand_eval.metrics[self.active_metric].keys()
+        )
+        return self.from_histogram(histogram)
+
+    def from_observations_per_resource(
+        self,
+        state: TuningJobState,
+        observations_per_resource: Callable[[str], Counter],
+        **kwargs,
+    ) -> int:
+        return self.from_histogram(observations_per_resource(self.active_metric))
+
+    def from_histogram(self, histogram: Counter) -> int:
+        """
+        :param histogram: Number of observations for ``active_metric`` per
+            resource level (int), for levels with at least one observation
+        :return: Resource level ``r_acq``
+        """
+        assert histogram, f"state must have data for metric {self.active_metric}"
         return self._max_at_least_threshold(histogram)
 
     def _max_at_least_threshold(self, counter: Counter) -> int:
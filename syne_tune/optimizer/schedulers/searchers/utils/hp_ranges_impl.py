@@ -10,7 +10,7 @@
 # on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
-from typing import Tuple, Dict, List, Any, Optional, Union
+from typing import Tuple, Dict, List, Any, Optional, Union, Iterable
 import numpy as np
 
 from syne_tune.config_space import (
@@ -49,6 +49,20 @@ class HyperparameterRange:
     def to_ndarray(self, hp: Hyperparameter) -> np.ndarray:
         raise NotImplementedError
 
+    def to_ndarray_matrix(self, hps: List[Hyperparameter]) -> np.ndarray:
+        """
+        Encodes several values at once. Subclasses may vectorize this.
+
+        :param hps: Values to encode
+        :return: Matrix of encoded values (rows), shape
+            ``(len(hps), ndarray_size())``
+        """
+        return np.vstack(
+            [self.to_ndarray(hp) for hp in hps]
+            if hps
+            else [np.zeros((0, self.ndarray_size()))]
+        )
+
     def from_ndarray(self, cand_ndarray: np.ndarray) -> Hyperparameter:
         raise NotImplementedError
 
@@ -134,6 +148,19 @@ class HyperparameterRangeContinuous(HyperparameterRange):
             result = np.clip((hp_internal - lower) / (upper - lower), 0.0, 1.0)
         return np.array([result])
 
+    def to_ndarray_matrix(self, hps: List[Hyperparameter]) -> np.ndarray:
+        hps = np.array(hps, dtype=np.float64)
+        assert np.all(
+            (self.lower_bound - EPS <= hps) & (hps <= self.upper_bound + EPS)
+        ), (hps, self)
+        lower, upper = self.lower_internal, self.upper_internal
+        if upper == lower:
+            result = np.zeros_like(hps)
+        else:
+            hps_internal = self.scaling.to_internal(hps)
+            result = np.clip((hps_internal - lower) / (upper - lower), 0.0, 1.0)
+        return result.reshape((-1, 1))
+
     def from_ndarray(self, ndarray: np.ndarray) -> Hyperparameter:
         return scale_from_zero_one(
             ndarray.item(),
@@ -218,6 +245,9 @@ class HyperparameterRangeInteger(HyperparameterRange):
     def to_ndarray(self, hp: Hyperparameter) -> np.ndarray:
         return self._continuous_range.to_ndarray(float(hp))
 
+    def to_ndarray_matrix(self, hps: List[Hyperparameter]) -> np.ndarray:
+        return self._continuous_range.to_ndarray_matrix(hps)
+
     def _round_to_int(self, value: float) -> int:
         return int(np.clip(round(value), self.lower_bound, self.upper_bound))
 
@@ -779,6 +809,18 @@ class HyperparameterRangesImpl(HyperparameterRanges):
         ]
         return np.hstack(pieces)
 
+    def to_ndarray_matrix(self, configs: Iterable[Configuration]) -> np.ndarray:
+        configs = list(configs)
+        # Encoding column by column allows hyperparameter ranges to vectorize
+        # over all configs. Columns are written into the result directly
+        matrix = np.empty((len(configs), self._ndarray_size))
+        for hp_range in self._hp_ranges:
+            start, end = self._encoded_ranges[hp_range.name]
+            matrix[:, start:end] = hp_range.to_ndarray_matrix(
+                [config[hp_range.name] for config in configs]
+            )
+        return matrix
+
     def from_ndarray(self, enc_config: np.ndarray) -> Configuration:
         enc_config = enc_config.reshape((-1, 1))
         assert enc_config.size == self._ndarray_size, (
@@ -823,6 +865,7 @@ class HyperparameterRangesImpl(HyperparameterRanges):
 def decode_extended_features(
     features_ext: np.ndarray,
     resource_attr_range: Tuple[int, int],
+    resource_dtype: str = "int64",
 ) -> (np.ndarray, np.ndarray):
     """
     Given matrix of features from extended configs, corresponding to
@@ -831,6 +874,7 @@ def decode_extended_features(
 
     :param features_ext: Matrix of features from extended configs
     :param resource_attr_range: ``(r_min, r_max)``
+    :param resource_dtype: Integer dtype of ``resources``. Defaults to "int64"
     :return: ``(features, resources)``
     """
     r_min, r_max = resource_attr_range
@@ -840,5 +884,23 @@ def decode_extended_features(
     width = r_max - r_min + 1 - 2 * EPS
     resources = np.clip(
         np.round(resources_encoded * width + lower), r_min, r_max
-    ).astype("int64")
+    ).astype(resource_dtype)
     return features, resources
+
+
+def decode_extended_resource(
+    resource_encoded: float,
+    resource_attr_range: Tuple[int, int],
+) -> int:
+    """
+    Same as :func:`decode_extended_features` for the resource value of a
+    single extended config, avoiding the overhead of array operations.
+
+    :param resource_encoded: Encoded resource value (last entry of features)
+    :param resource_attr_range: ``(r_min, r_max)``
+    :return: Resource value
+    """
+    r_min, r_max = resource_attr_range
+    lower = r_min - 0.5 + EPS
+    width = r_max - r_min + 1 - 2 * EPS
+    return min(max(int(round(float(resource_encoded) * width + lower)), r_min), r_max)
@@ -40,7 +40,7 @@ class LinearScaling(Scaling):
 
 class LogScaling(Scaling):
     def to_internal(self, value: float) -> float:
-        assert value > 0, "Value must be strictly positive to be log-scaled."
+        assert np.all(value > 0), "Value must be strictly positive to be log-scaled."
         return np.log(value)
 
     def from_internal(self, value: float) -> float:
@@ -49,8 +49,8 @@ class LogScaling(Scaling):
 
 class ReverseLogScaling(Scaling):
     def to_internal(self, value: float) -> float:
-        assert (
-            0 <= value < 1
+        assert np.all(
+            (0 <= value) & (value < 1)
         ), "Value must be between 0 (inclusive) and 1 (exclusive) to be reverse-log-scaled."
         return -np.log(1.0 - value)
 
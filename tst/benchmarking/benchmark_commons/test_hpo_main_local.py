@@ -91,6 +91,9 @@ class HPOMainLocalTests(unittest.TestCase):
                 "support_checkpointing": True,
                 "fcnet_ordinal": "nn-log",
                 "restrict_configurations": False,
+                "max_parallel": 1,
+                "num_shards": 1,
+                "shard_index": 0,
                 "seeds": seeds,
             }
         )
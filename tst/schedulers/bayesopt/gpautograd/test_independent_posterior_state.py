@@ -0,0 +1,324 @@
+# Copyright 2021 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+import numpy as np
+import autograd.numpy as anp
+from autograd import grad
+import pytest
+
+from syne_tune.optimizer.schedulers.searchers.bayesopt.gpautograd.independent.posterior_state import (
+    IndependentGPPerResourcePosteriorState,
+    PerResourceStateCache,
+)
+from syne_tune.optimizer.schedulers.searchers.bayesopt.gpautograd.posterior_state import (
+    GaussProcPosteriorState,
+)
+from syne_tune.optimizer.schedulers.searchers.bayesopt.gpautograd.kernel import Matern52
+from syne_tune.optimizer.schedulers.searchers.bayesopt.gpautograd.mean import (
+    ScalarMeanFunction,
+)
+from syne_tune.optimizer.schedulers.searchers.bayesopt.gpautograd.independent.gpind_model import (
+    IndependentGPPerResourceModel,
+)
+from syne_tune.optimizer.schedulers.searchers.bayesopt.models.gp_model import (
+    GaussProcEmpiricalBayesEstimator,
+)
+from syne_tune.optimizer.schedulers.searchers.bayesopt.datatypes.config_ext import (
+    ExtendedConfiguration,
+)
+from syne_tune.optimizer.schedulers.searchers.bayesopt.datatypes.common import (
+    TrialEvaluations,
+    INTERNAL_METRIC_NAME,
+)
+from syne_tune.optimizer.schedulers.searchers.bayesopt.datatypes.tuning_job_state import (
+    TuningJobState,
+)
+from syne_tune.optimizer.schedulers.searchers.utils import make_hyperparameter_ranges
+from syne_tune.config_space import uniform
+
+
+RESOURCE_ATTR_RANGE = (1, 9)
+
+
+def _encode_resources(resources: np.ndarray) -> np.ndarray:
+    r_min, r_max = RESOURCE_ATTR_RANGE
+    return (resources - r_min + 0.5) / (r_max - r_min + 1)
+
+
+def _extend_features(features: np.ndarray, resources: np.ndarray) -> np.ndarray:
+    return np.concatenate(
+        (features, _encode_resources(resources).reshape((-1, 1))), axis=1
+    )
+
+
+def _create_kernel_and_mean(rung_levels, dimension=2):
+    kernel = Matern52(dimension=dimension)
+    kernel.collect_params().initialize()
+    mean = {resource: ScalarMeanFunction() for resource in rung_levels}
+    for mean_function in mean.values():
+        mean_function.collect_params().initialize()
+    return kernel, mean
+
+
+def _create_states(
+    rung_levels,
+    resources,
+    dimension=2,
+    random_seed=31415927,
+    covariance_scale=None,
+    state_cache=None,
+    kernel=None,
+    mean=None,
+):
+    # Features and targets are drawn from separate streams, so that appending
+    # entries to ``resources`` does not change data for the existing ones
+    num_data = resources.size
+    features = np.random.RandomState(random_seed).uniform(size=(num_data, dimension))
+    targets = np.random.RandomState(random_seed + 1).normal(size=(num_data, 1))
+    if kernel is None:
+        kernel, mean = _create_kernel_and_mean(rung_levels, dimension)
+    if covariance_scale is None:
+        covariance_scale = {
+            resource: np.array([1.0 + 0.1 * pos])
+            for pos, resource in enumerate(rung_levels)
+        }
+    noise_variance = np.array([0.01])
+    state = IndependentGPPerResourcePosteriorState(
+        features=_extend_features(features, resources),
+        targets=targets,
+        kernel=kernel,
+        mean=mean,
+        covariance_scale=covariance_scale,
+        noise_variance=noise_variance,
+        resource_attr_range=RESOURCE_ATTR_RANGE,
+        state_cache=state_cache,
+    )
+    states_direct = dict()
+    for resource in rung_levels:
+        rows = np.flatnonzero(resources == resource)
+        if rows.size > 0:
+            states_direct[resource] = GaussProcPosteriorState(
+                features=features[rows],
+                targets=targets[rows],
+                mean=mean[resource],
+                kernel=(kernel, covariance_scale[resource]),
+                noise_variance=noise_variance,
+            )
+    return state, states_direct
+
+
+@pytest.mark.parametrize(
+    "resources",
+    [
+        np.array([1, 3, 9, 1, 1, 3, 9, 9, 1, 3, 1]),
+        np.array([9, 9, 1, 1, 1, 1, 1, 1]),
+        np.array([3, 3, 3, 3]),
+    ],
+)
+def test_independent_posterior_state_matches_direct(resources):
+    rung_levels = [1, 3, 9]
+    state, states_direct = _create_states(rung_levels, resources)
+    assert set(state._states.keys()) == set(states_direct.keys())
+    for resource, state_direct in states_direct.items():
+        np.testing.assert_almost_equal(
+            state.state(resource).chol_fact, state_direct.chol_fact
+        )
+        np.testing.assert_almost_equal(
+            state.state(resource).pred_mat, state_direct.pred_mat
+        )
+    # Predictions at test points with mixed resources, in arbitrary order
+    random_state = np.random.RandomState(2718281)
+    supported = np.array(list(states_direct.keys()))
+    test_resources = random_state.choice(supported, size=20)
+    test_features = random_state.uniform(size=(20, 2))
+    means, variances = state.predict(_extend_features(test_features, test_resources))
+    for pos, resource in enumerate(test_resources):
+        mean, variance = states_direct[resource].predict(test_features[pos : (pos + 1)])
+        np.testing.assert_almost_equal(means[pos], mean[0])
+        np.testing.assert_almost_equal(variances[pos], variance[0])
+    # Sampling falls back to prior mean for rung levels without data
+    test_resources = np.array(rung_levels * 2)
+    test_features = random_state.uniform(size=(test_resources.size, 2))
+    for sample_method in (state.sample_marginals, state.sample_joint):
+        samples = sample_method(
+            _extend_features(test_features, test_resources),
+            num_samples=3,
+            random_state=random_state,
+        )
+        assert samples.shape == (test_resources.size, 3)
+        for pos, resource in enumerate(test_resources):
+            if resource not in states_direct:
+                prior_mean = state._mean[resource](test_features[pos : (pos + 1)])
+                np.testing.assert_almost_equal(
+                    samples[pos], np.full(3, prior_mean.item())
+                )
+
+
+def test_independent_posterior_state_predict_many_test_points():
+    rung_levels = [1, 3, 9]
+    resources = np.array([1, 3, 9] * 4)
+    state, states_direct = _create_states(rung_levels, resources)
+    random_state = np.random.RandomState(2718281)
+    num_test = 3 * 100
+    test_resources = random_state.permutation(np.array(rung_levels * 100))
+    test_features = random_state.uniform(size=(num_test, 2))
+    means, variances = state.predict(_extend_features(test_features, test_resources))
+    assert means.shape == (num_test, 1)
+    for resource, state_direct in states_direct.items():
+        rows = np.flatnonzero(test_resources == resource)
+        mean, variance = state_direct.predict(test_features[rows])
+        np.testing.assert_almost_equal(means[rows], mean)
+        np.testing.assert_almost_equal(variances[rows], variance)
+
+
+def test_independent_posterior_state_backward_gradient():
+    rung_levels = [1, 3, 9]
+    resources = np.array([1, 3, 9] * 4)
+    state, states_direct = _create_states(rung_levels, resources)
+    random_state = np.random.RandomState(2718281)
+    head_gradients = {"mean": np.array([0.5]), "std": np.array([-0.3])}
+    for resource, state_direct in states_direct.items():
+        feature = random_state.uniform(size=2)
+        input = _extend_features(feature.reshape((1, -1)), np.array([resource]))
+        gradient = state.backward_gradient(
+            input.reshape((-1,)), head_gradients, mean_data=0.1, std_data=2.0
+        )
+        assert gradient.shape == (3,)
+        gradient_direct = state_direct.backward_gradient(
+            feature, head_gradients, mean_data=0.1, std_data=2.0
+        )
+        np.testing.assert_almost_equal(gradient[:-1], gradient_direct)
+        assert gradient[-1] == 0
+
+
+def test_independent_posterior_state_predict_autograd():
+    rung_levels = [1, 3]
+    resources = np.array([1, 3, 1, 3, 1, 3])
+    random_state = np.random.RandomState(2718281)
+    test_features = _extend_features(
+        random_state.uniform(size=(5, 2)), np.array([3, 1, 1, 3, 1])
+    )
+
+    def objective(scale):
+        state, _ = _create_states(
+            rung_levels, resources, covariance_scale={1: scale, 3: 2.0 * scale}
+        )
+        means, variances = state.predict(test_features)
+        return anp.sum(means) + anp.sum(variances)
+
+    scale = np.array([1.5])
+    delta = 1e-6
+    gradient = grad(objective)(scale)
+    gradient_fd = (objective(scale + delta) - objective(scale - delta)) / (2 * delta)
+    np.testing.assert_almost_equal(gradient, gradient_fd, decimal=4)
+
+
+def test_independent_posterior_state_cache():
+    rung_levels = [1, 3, 9]
+    resources = np.array([1, 3, 9, 1, 3, 1])
+    # Cache keys depend on the kernel and mean function instances
+    kernel, mean = _create_kernel_and_mean(rung_levels)
+    common_kwargs = dict(state_cache=PerResourceStateCache(), kernel=kernel, mean=mean)
+    state1, _ = _create_states(rung_levels, resources, **common_kwargs)
+    # Append a datapoint at resource 3: Only this state must be recomputed
+    state2, _ = _create_states(rung_levels, np.append(resources, 3), **common_kwargs)
+    assert state2.state(1) is state1.state(1)
+    assert state2.state(9) is state1.state(9)
+    assert state2.state(3) is not state1.state(3)
+    assert state2.state(3).num_data == 3
+    # Different parameters: Nothing is reused
+    state3, _ = _create_states(
+        rung_levels,
+        resources,
+        covariance_scale={r: np.array([2.0]) for r in rung_levels},
+        **common_kwargs,
+    )
+    for resource in rung_levels:
+        assert state3.state(resource) is not state1.state(resource)
+    # Different kernel instance: Nothing is reused
+    state4, _ = _create_states(
+        rung_levels,
+        resources,
+        state_cache=common_kwargs["state_cache"],
+    )
+    for resource in rung_levels:
+        assert state4.state(resource) is not state1.state(resource)
+
+
+def test_independent_posterior_state_cache_with_estimator():
+    # Targets are normalized over all observed data, so states can only be
+    # reused if observed data does not change
+    rung_levels = [1, 3, 9]
+    hp_ranges = make_hyperparameter_ranges(
+        {"x": uniform(0.0, 1.0), "y": uniform(0.0, 1.0)}
+    )
+    config_space_ext = ExtendedConfiguration(
+        hp_ranges,
+        resource_attr_key="epoch",
+        resource_attr_range=RESOURCE_ATTR_RANGE,
+    )
+    gpmodel = IndependentGPPerResourceModel(
+        kernel=Matern52(dimension=2),
+        mean_factory=lambda resource: ScalarMeanFunction(),
+        resource_attr_range=RESOURCE_ATTR_RANGE,
+        random_seed=31415927,
+    )
+    gpmodel.create_likelihood(rung_levels)
+    estimator = GaussProcEmpiricalBayesEstimator(
+        gpmodel=gpmodel, num_fantasy_samples=2, normalize_targets=True
+    )
+    random_state = np.random.RandomState(31415927)
+    state = TuningJobState.empty_state(config_space_ext.hp_ranges_ext)
+
+    def append_observed(trial_id, resources):
+        state.config_for_trial[trial_id] = {
+            "x": random_state.uniform(),
+            "y": random_state.uniform(),
+        }
+        metrics = {str(resource): random_state.normal() for resource in resources}
+        state.trials_evaluations.append(
+            TrialEvaluations(trial_id, {INTERNAL_METRIC_NAME: metrics})
+        )
+
+    for trial_id in range(6):
+        append_observed(str(trial_id), [1, 3] if trial_id < 3 else [1])
+    state.append_pending("3", resource=3)
+    estimator.fit_from_state(state, update_params=False)
+    state1 = gpmodel.states[0]
+    # New pending evaluation at resource 3: State at resource 1 is reused
+    state.append_pending("4", resource=3)
+    estimator.fit_from_state(state, update_params=False)
+    state2 = gpmodel.states[0]
+    assert state2.state(1) is state1.state(1)
+    assert state2.state(3) is not state1.state(3)
+    # New observation: Normalized targets change for all resources
+    append_observed("6", [1])
+    estimator.fit_from_state(state, update_params=False)
+    state3 = gpmodel.states[0]
+    assert state3.state(1) is not state2.state(1)
+    assert state3.state(3) is not state2.state(3)
+
+
+@pytest.mark.parametrize("rung_levels", [[1, 3, 9], [1, 2, 3, 5, 7, 9]])
+def test_independent_posterior_state_predict_grouping(rung_levels):
+    # Covers both grouping by masks (few resources) and by sorting
+    resources = np.array(rung_levels * 3)
+    state, states_direct = _create_states(rung_levels, resources)
+    random_state = np.random.RandomState(2718281)
+    test_resources = random_state.permutation(np.array(rung_levels * 5))
+    test_features = random_state.uniform(size=(test_resources.size, 2))
+    means, variances = state.predict(_extend_features(test_features, test_resources))
+    for resource, state_direct in states_direct.items():
+        rows = np.flatnonzero(test_resources == resource)
+        mean, variance = state_direct.predict(test_features[rows])
+        np.testing.assert_almost_equal(means[rows], mean)
+        np.testing.assert_almost_equal(variances[rows], variance)
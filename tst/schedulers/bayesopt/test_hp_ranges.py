@@ -34,6 +34,8 @@ from syne_tune.optimizer.schedulers.searchers.utils.hp_ranges_factory import (
 )
 from syne_tune.optimizer.schedulers.searchers.utils.hp_ranges_impl import (
     HyperparameterRangesImpl,
+    decode_extended_features,
+    decode_extended_resource,
 )
 from syne_tune.optimizer.schedulers.searchers.bayesopt.datatypes.config_ext import (
     ExtendedConfiguration,
@@ -507,3 +509,43 @@ def test_encoded_ranges():
     assert encoded_ranges["7"] == (14, 15)
     assert encoded_ranges["8"] == (15, 16)
     assert encoded_ranges["9"] == (16, 17)
+
+
+@pytest.mark.parametrize("resource_attr_range", [(1, 9), (1, 81), (3, 3), (0, 100)])
+def test_decode_extended_resource(resource_attr_range):
+    random_state = np.random.RandomState(31415927)
+    features_ext = random_state.uniform(low=-0.01, high=1.01, size=(500, 2))
+    _, resources = decode_extended_features(features_ext, resource_attr_range)
+    for value, resource in zip(features_ext[:, -1], resources):
+        assert decode_extended_resource(value, resource_attr_range) == resource
+
+
+def test_to_ndarray_matrix():
+    config_space = {
+        "0": uniform(1.0, 1000.0),
+        "1": loguniform(1.0, 1000.0),
+        "2": reverseloguniform(0.9, 0.9999),
+        "3": randint(1, 1000),
+        "4": lograndint(1, 1000),
+        "5": choice(["a", "b", "c"]),
+        "6": choice(["a", "b"]),
+        "7": finrange(0.1, 1.0, 10),
+        "8": logordinal([1, 2, 4, 8]),
+        "9": uniform(2.0, 2.0),
+    }
+    hp_ranges = make_hyperparameter_ranges(config_space)
+    config_space_ext = ExtendedConfiguration(
+        hp_ranges=hp_ranges,
+        resource_attr_key="epoch",
+        resource_attr_range=(1, 27),
+    )
+    hp_ranges_ext = config_space_ext.hp_ranges_ext
+    hp_ranges_ext.value_for_last_pos = 9
+    random_state = np.random.RandomState(31415927)
+    for ranges in (hp_ranges, hp_ranges_ext):
+        configs = ranges.random_configs(random_state, 20)
+        matrix = ranges.to_ndarray_matrix(configs)
+        assert matrix.shape == (20, ranges.ndarray_size)
+        assert_allclose(
+            matrix, np.vstack([ranges.to_ndarray(config) for config in configs])
+        )
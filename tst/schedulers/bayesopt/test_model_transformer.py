@@ -0,0 +1,111 @@
+# Copyright 2021 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+from syne_tune.config_space import uniform
+from syne_tune.optimizer.schedulers.searchers.bayesopt.datatypes.config_ext import (
+    ExtendedConfiguration,
+)
+from syne_tune.optimizer.schedulers.searchers.bayesopt.datatypes.common import (
+    TrialEvaluations,
+    INTERNAL_METRIC_NAME,
+)
+from syne_tune.optimizer.schedulers.searchers.bayesopt.datatypes.tuning_job_state import (
+    TuningJobState,
+)
+from syne_tune.optimizer.schedulers.searchers.bayesopt.models.estimator import (
+    Estimator,
+)
+from syne_tune.optimizer.schedulers.searchers.bayesopt.models.model_transformer import (
+    ModelStateTransformer,
+)
+from syne_tune.optimizer.schedulers.searchers.utils import (
+    make_hyperparameter_ranges,
+)
+
+
+class CountingEstimator(Estimator):
+    def __init__(self):
+        self.num_fits = 0
+
+    def get_params(self):
+        return dict()
+
+    def set_params(self, param_dict):
+        pass
+
+    def fit_from_state(self, state, update_params):
+        self.num_fits += 1
+        return object()
+
+
+def test_predictor_cache_invalidation():
+    hp_ranges = ExtendedConfiguration(
+        hp_ranges=make_hyperparameter_ranges({"x": uniform(0.0, 1.0)}),
+        resource_attr_key="epoch",
+        resource_attr_range=(1, 9),
+    ).hp_ranges_ext
+    estimator = CountingEstimator()
+    transformer = ModelStateTransformer(
+        estimator=estimator,
+        init_state=TuningJobState.empty_state(hp_ranges),
+    )
+    config = {"x": 0.5}
+    transformer.label_trial(
+        TrialEvaluations(trial_id="0", metrics={INTERNAL_METRIC_NAME: {"1": 0.3}}),
+        config=config,
+    )
+    transformer.append_trial("0", resource=3)
+    predictor = transformer.fit()
+    # Predictor is reused as long as the state does not change
+    assert transformer.fit() is predictor
+    assert estimator.num_fits == 1
+    # Dropping a pending evaluation which does not exist changes nothing
+    assert not transformer.drop_pending_evaluation("0", resource=9)
+    assert transformer.fit() is predictor
+    assert transformer.drop_pending_evaluation("0", resource=3)
+    predictor = transformer.fit()
+    assert estimator.num_fits == 2
+    transformer.remove_observed_case("0", key="1")
+    transformer.fit()
+    assert estimator.num_fits == 3
+
+
+def test_observations_per_resource():
+    hp_ranges = ExtendedConfiguration(
+        hp_ranges=make_hyperparameter_ranges({"x": uniform(0.0, 1.0)}),
+        resource_attr_key="epoch",
+        resource_attr_range=(1, 9),
+    ).hp_ranges_ext
+    transformer = ModelStateTransformer(
+        estimator=CountingEstimator(),
+        init_state=TuningJobState.empty_state(hp_ranges),
+    )
+
+    def label_trial(trial_id, metric_vals):
+        transformer.label_trial(
+            TrialEvaluations(
+                trial_id=trial_id, metrics={INTERNAL_METRIC_NAME: metric_vals}
+            ),
+            config={"x": 0.1 * int(trial_id)},
+        )
+
+    label_trial("0", {"1": 0.3, "3": 0.2})
+    histogram = transformer.observations_per_resource()
+    assert histogram == {1: 1, 3: 1}
+    # Incremental updates, overwriting an observation does not count
+    label_trial("1", {"1": 0.4})
+    label_trial("0", {"3": 0.1, "9": 0.05})
+    assert histogram == {1: 2, 3: 1, 9: 1}
+    transformer.remove_observed_case("0", key="9")
+    assert histogram == {1: 2, 3: 1}
+    transformer.remove_observed_case("0")
+    assert histogram == {1: 1}
@@ -20,6 +20,7 @@ from syne_tune.optimizer.baselines import (
     GridSearch,
     BayesianOptimization,
     ASHA,
+    MOBSTER,
     HyperTune,
     DyHPO,
     SyncHyperband,
@@ -283,3 +284,24 @@ def test_reject_nan_inf():
         scheduler.on_trial_complete(trial, result={"metric": y})
     state = scheduler.searcher.state_transformer.state
     assert len(state.trials_evaluations) == 2
+
+
+def test_multifidelity_cleanup_pending():
+    config_space = {"x": uniform(0.0, 1.0), "epochs": 9}
+    scheduler = MOBSTER(
+        config_space,
+        metric="y",
+        mode="min",
+        resource_attr="epoch",
+        max_resource_attr="epochs",
+    )
+    searcher = scheduler.searcher
+    searcher.register_pending("0", config={"x": 0.1}, milestone=1)
+    searcher.register_pending("1", config={"x": 0.2}, milestone=1)
+    searcher.register_pending("1", config={"x": 0.2}, milestone=3)
+    searcher.cleanup_pending("0")
+    pending_evaluations = searcher.state_transformer.state.pending_evaluations
+    assert [(x.trial_id, x.resource) for x in pending_evaluations] == [
+        ("1", 1),
+        ("1", 3),
+    ]